@@ -4,13 +4,23 @@ Script to grab relevant GTFS and LODES OD pairs for transit analysis.
 Raises:
     ValueError: If TRANSITLAND_API_KEY environment variable is not set.
     ValueError: If no feed versions are found for the specified feed key.
+    ValueError: If the selected feed version has no sha1.
 """
 
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import functools
+import hashlib
+import json
 import pathlib
 import os
+import shutil
+import threading
 
 import pandas
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from pygris.data import get_lodes
 from dotenv import load_dotenv
@@ -23,83 +33,197 @@ FEED_ID = "f-drt0-metrowestregionaltransitauthority"
 TRANSITLAND_API_KEY = os.getenv("TRANSITLAND_API_KEY")
 BASE_API_URL = "https://transit.land/api/v2/rest"
 FOLDER = pathlib.Path(__file__).parent.resolve()
+CACHE_FOLDER = FOLDER / ".cache"
+PRINT_LOCK = threading.Lock()
+FEED_VERSIONS_LOCK = threading.Lock()
+
+# one session for all transit.land calls, so requests reuse the same connection.
+# main's scrape jobs share it across threads, which is fine for plain GETs like these
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(
+            total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504)
+        ),
+    ),
+)
+if TRANSITLAND_API_KEY:
+    SESSION.headers["apikey"] = TRANSITLAND_API_KEY
 
 
 def main():
     """
     Runs all other functions to download relevant data.
     """
-    print("Grabbing GTFS data...")
-    scrape_gtfs(FEED_ID)
+    # the scrapes are independent and network bound, so run them side by side
+    jobs = [
+        ("Grabbing GTFS data...", functools.partial(scrape_gtfs, FEED_ID)),
+        (
+            "Grabbing archived GTFS data...",
+            functools.partial(scrape_gtfs, FEED_ID, latest=False),
+        ),
+        (
+            "Grabbing LODES data from latest year available...",
+            functools.partial(scrape_lodes, STATE),
+        ),
+        (
+            "Grabbing LODES data from 2021...",
+            functools.partial(scrape_lodes, STATE, year=2021),
+        ),
+    ]
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [executor.submit(_run_job, message, job) for message, job in jobs]
+        for future in as_completed(futures):
+            future.result()
 
-    print("Grabbing archived GTFS data...")
-    scrape_gtfs(FEED_ID, latest=False)
+    print("All done!")
 
-    print("Grabbing LODES data from latest year available...")
-    scrape_lodes(STATE)
 
-    print("Grabbing LODES data from 2021...")
-    scrape_lodes(STATE, year=2021)
+def _run_job(message: str, job: Callable[[], None]):
+    """
+    Prints a progress message and runs a scrape job, used by main's thread pool.
 
-    print("All done!")
+    Args:
+        message (str): progress message to print before the job starts.
+        job (Callable[[], None]): the scrape to run.
+    """
+    with PRINT_LOCK:
+        print(message)
+    job()
 
 
-def scrape_gtfs(feed_key: str, latest: bool = True):
+def scrape_gtfs(feed_key: str, latest: bool = True, force: bool = False):
     """
     Grabs GTFS zip file and downloads it to data folder. Relies on transit.land feed keys.
+    Skips the download if the zip already on disk matches the feed version's sha1.
 
     Args:
         feed_key (str): transit.land feed lookup key.
         latest (bool, optional): Whether to download the latest feed version. Defaults to True.
+        force (bool, optional): Whether to download even if the zip matches. Defaults to False.
 
     Raises:
         ValueError: If TRANSITLAND_API_KEY environment variable is not set.
         ValueError: If no feed versions are found for the specified feed key.
+        ValueError: If the selected feed version has no sha1.
     """
 
     if not TRANSITLAND_API_KEY:
         raise ValueError("TRANSITLAND_API_KEY environment variable not set.")
 
+    # Get the feed versions, newest first, to know which one is being downloaded
+    feed_versions = _get_feed_versions(feed_key)
+
     feed_url: str
     if latest:
+        feed_version_key = feed_versions[0]
         feed_url = f"{BASE_API_URL}/feeds/{feed_key}/download_latest_feed_version"
     else:
-        # Get the feed versions to find an archived one
-        versions_url = f"{BASE_API_URL}/feeds/{feed_key}/feed_versions"
-        versions_response = requests.get(
-            versions_url, headers={"apikey": f"{TRANSITLAND_API_KEY}"}, timeout=10
-        )
-        versions_response.raise_for_status()
-        versions_data = versions_response.json()
-
-        # Get the oldest feed version
-        feed_versions = versions_data.get("feed_versions", [])
-        if not feed_versions:
-            raise ValueError("No feed versions found for the specified feed key.")
-
-        if len(feed_versions) < 12:
-            feed_version_key = feed_versions[-1].get("sha1", "")
-        else:
-            feed_version_key = feed_versions[12].get("sha1", "")
+        # Get the oldest feed version, up to 12 versions back
+        feed_version_key = feed_versions[min(12, len(feed_versions) - 1)]
 
         # Get the archived feed version download URL using the feed version key
         feed_url = f"{BASE_API_URL}/feed_versions/{feed_version_key}/download"
 
-    response = requests.get(
-        feed_url, headers={"apikey": f"{TRANSITLAND_API_KEY}"}, timeout=10
+    if not feed_version_key:
+        raise ValueError("Feed version has no sha1.")
+
+    gtfs_path = (
+        FOLDER / "gtfs" / f"gtfs_{feed_key}_{"latest" if latest else "archived"}.zip"
     )
-    response.raise_for_status()
 
-    with open(
-        FOLDER / "gtfs" / f"gtfs_{feed_key}_{"latest" if latest else "archived"}.zip",
-        "wb",
-    ) as f:
-        f.write(response.content)
+    # transit.land keys feed versions by the sha1 of their zip
+    if not force and gtfs_path.exists():
+        with open(gtfs_path, "rb") as f:
+            if hashlib.file_digest(f, "sha1").hexdigest() == feed_version_key:
+                return
 
+    # stream the zip to disk in chunks instead of holding it all in memory
+    with SESSION.get(feed_url, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
 
-def scrape_lodes(state: str, year: int = 2022):
+        with open(gtfs_path, "wb") as f:
+            shutil.copyfileobj(response.raw, f, length=1 << 16)
+
+
+def _get_feed_versions(feed_key: str) -> tuple[str, ...]:
+    """
+    Thread safe wrapper around _fetch_feed_versions, used by scrape_gtfs.
+
+    Args:
+        feed_key (str): transit.land feed lookup key.
+
+    Returns:
+        tuple[str, ...]: sha1 keys of the feed versions, in the order returned by transit.land.
+    """
+    # the latest and archived GTFS jobs run side by side; hold the lock across the
+    # cached call so only one of them fetches the listing and writes the cache files
+    with FEED_VERSIONS_LOCK:
+        return _fetch_feed_versions(feed_key)
+
+
+@functools.lru_cache(maxsize=None)
+def _fetch_feed_versions(feed_key: str) -> tuple[str, ...]:
+    """
+    Gets the feed version keys of a transit.land feed. Only the sha1 of each version is
+    kept, and that list is cached on disk with its ETag, so re-runs only download it again
+    if it changed.
+
+    Args:
+        feed_key (str): transit.land feed lookup key.
+
+    Raises:
+        ValueError: If no feed versions are found for the specified feed key.
+
+    Returns:
+        tuple[str, ...]: sha1 keys of the feed versions, in the order returned by transit.land.
+    """
+
+    versions_url = f"{BASE_API_URL}/feeds/{feed_key}/feed_versions"
+    cache_path = CACHE_FOLDER / f"feed_version_sha1s_{feed_key}.json"
+    etag_path = CACHE_FOLDER / f"feed_versions_{feed_key}.etag"
+
+    headers: dict[str, str] = {}
+    if cache_path.exists() and etag_path.exists():
+        headers["If-None-Match"] = etag_path.read_text(encoding="utf-8")
+
+    versions_response = SESSION.get(versions_url, headers=headers, timeout=10)
+    if versions_response.status_code == 304:
+        feed_versions = json.loads(cache_path.read_text(encoding="utf-8"))
+    else:
+        versions_response.raise_for_status()
+        versions_data = versions_response.json()
+        # only the sha1 is ever used, so drop the rest of each version entry
+        feed_versions = [
+            version.get("sha1", "")
+            for version in versions_data.get("feed_versions", [])
+        ]
+
+        CACHE_FOLDER.mkdir(exist_ok=True)
+        cache_path.write_text(json.dumps(feed_versions), encoding="utf-8")
+        etag = versions_response.headers.get("ETag")
+        if etag:
+            etag_path.write_text(etag, encoding="utf-8")
+        else:
+            etag_path.unlink(missing_ok=True)
+
+    if not feed_versions:
+        raise ValueError("No feed versions found for the specified feed key.")
+
+    return tuple(feed_versions)
+
+
+def scrape_lodes(
+    state: str, year: int = 2022, force: bool = False, by_tract: bool = False
+):
     """
     Scrapes LODES OD pair data from Census and saves it as a (very large) csv.
+    Skips the scrape if the csv already exists, since released LODES years do not change.
+    With by_tract, the block pairs are summed into tract pairs first for a much smaller csv.
 
     .. TIP::
         Check out https://lehd.ces.census.gov/data/ for more information on LODES data.
@@ -107,14 +231,74 @@ def scrape_lodes(state: str, year: int = 2022):
     Args:
         state (str): The state to scrape data for.
         year (int, optional): The year to scrape data for. Defaults to 2022.
+        force (bool, optional): Whether to scrape even if the csv exists. This also skips
+            the pickled copy under .cache, refetching from Census. Defaults to False.
+        by_tract (bool, optional): Whether to aggregate OD pairs to tracts. Defaults to False.
+    """
+    lodes_path = (
+        FOLDER
+        / "lodes"
+        / f"lodes_od_{state.lower()}_{year}{"_tract" if by_tract else ""}.csv"
+    )
+    if not force and lodes_path.exists():
+        return
+
+    lodes_od = _get_lodes_od(state, year, refetch=force)
+
+    if by_tract:
+        lodes_od = _aggregate_lodes_by_tract(lodes_od)
+
+    # let pandas write straight to disk rather than building the whole csv in memory
+    lodes_od.to_csv(lodes_path, encoding="utf-8")
+
+
+def _get_lodes_od(state: str, year: int, refetch: bool = False) -> pandas.DataFrame:
+    """
+    Gets LODES OD data through pygris, pickled on disk by state and year so later runs
+    (e.g. with by_tract) skip the Census download and csv parsing. The pickle is a second
+    full copy of the table, and is only replaced when refetch is set.
+
+    Args:
+        state (str): The state to get data for.
+        year (int): The year to get data for.
+        refetch (bool, optional): Whether to ignore and overwrite the pickle. Defaults to False.
+
+    Returns:
+        pandas.DataFrame: block level LODES OD data.
     """
+    cache_path = CACHE_FOLDER / f"lodes_od_{state.lower()}_{year}.pkl"
+    if not refetch and cache_path.exists():
+        return pandas.read_pickle(cache_path)
+
     lodes_od = get_lodes(state=state, year=year, lodes_type="od")
     assert isinstance(lodes_od, pandas.DataFrame)
 
-    with open(
-        FOLDER / "lodes" / f"lodes_od_{state.lower()}_{year}.csv", "w", encoding="utf-8"
-    ) as f:
-        f.write(lodes_od.to_csv(encoding="utf-8"))
+    CACHE_FOLDER.mkdir(exist_ok=True)
+    lodes_od.to_pickle(cache_path)
+    return lodes_od
+
+
+def _aggregate_lodes_by_tract(lodes_od: pandas.DataFrame) -> pandas.DataFrame:
+    """
+    Sums LODES OD job counts from block pairs up to tract pairs, in one vectorized groupby.
+
+    Args:
+        lodes_od (pandas.DataFrame): block level LODES OD data.
+
+    Returns:
+        pandas.DataFrame: summed job count columns, indexed by (w_tract, h_tract).
+    """
+    # tract geocodes are the first 11 digits of the 15 digit block geocodes
+    w_tract = lodes_od["w_geocode"].astype(str).str.zfill(15).str[:11]
+    h_tract = lodes_od["h_geocode"].astype(str).str.zfill(15).str[:11]
+
+    # job counts are S000 and its SA/SE/SI breakdowns
+    job_columns = [column for column in lodes_od.columns if column.startswith("S")]
+    return (
+        lodes_od[job_columns]
+        .groupby([w_tract.rename("w_tract"), h_tract.rename("h_tract")], sort=False)
+        .sum()
+    )
 
 
 if __name__ == "__main__":
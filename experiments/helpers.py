@@ -149,24 +149,22 @@ def get_assigned_students(problem_data: ProblemDataReal) -> tuple[Student, ...]:
         assigned_students["BUS STOP"].isin(stop_names)
     ]
 
+    # look schools and stops up by name, keeping the first of any repeated name
+    schools_by_name = {school.name: school for school in reversed(problem_data.schools)}
+    stops_by_name = {stop.name: stop for stop in reversed(problem_data.stops)}
+
     students: list[Student] = []
     for _, row in assigned_students.iterrows():
         special_ed = "SPED" in row["Student_Program"]
         # am not sure this is how they mark it, follow up
         wheelchair_user = "WHEELCHAIR" in row["Student_Program"]
-        stop = next(stop for stop in problem_data.stops if stop.name == row["BUS STOP"])
+        stop = stops_by_name[row["BUS STOP"]]
 
         student = Student(
             name=f"{row['Student_First Name']} {row['Student_Last Name']}",
             geographic_location=stop.geographic_location,
-            school=next(
-                school
-                for school in problem_data.schools
-                if school.name == row["Student_School"]
-            ),
-            stop=next(
-                stop for stop in problem_data.stops if stop.name == row["BUS STOP"]
-            ),
+            school=schools_by_name[row["Student_School"]],
+            stop=stop,
             demographics=DemographicInfo(
                 special_ed=special_ed, wheelchair_user=wheelchair_user
             ),
@@ -2,6 +2,11 @@ import os
 from pathlib import Path
 import yaml
 
+try:
+    from yaml import CDumper as Dumper
+except ImportError:
+    from yaml import Dumper
+
 import pandas as pd
 
 from formulation.common.classes import Bus, BusType, Depot
@@ -155,7 +160,7 @@ def main() -> None:
     }
 
     with open(FLEET_OUTPUT, "w+", encoding="utf-8") as f:
-        yaml.dump(data, f)
+        yaml.dump(data, f, Dumper=Dumper)
 
 
 if __name__ == "__main__":
@@ -141,6 +141,11 @@ def get_rows() -> list[SamplingTable]:
             r_bmon: tupledict[tuple[Any, ...], Var] = vals["r_bmon"]
             a_mbq: tupledict[tuple[Any, ...], Var] = vals["a_mbq"]
 
+            z_b_x = model.getAttr("X", z_b)
+            x_bqij_x = model.getAttr("X", x_bqij)
+            r_bmon_x = model.getAttr("X", r_bmon)
+            a_mbq_x = model.getAttr("X", a_mbq)
+
             total_distance = 0.0
             buses_with_monitors = 0
             buses_total = 0
@@ -148,17 +153,17 @@ def get_rows() -> list[SamplingTable]:
             buses_with_wheelchair_access = 0
 
             for b, bus in enumerate(B):
-                if z_b[b].X > 0.5:
+                if z_b_x[b] > 0.5:
                     buses_total += 1
                     total_bus_capacity += bus.capacity
                     if bus.has_wheelchair_access:
                         buses_with_wheelchair_access += 1
-                    if r_bmon[b].X > 0.5:
+                    if r_bmon_x[b] > 0.5:
                         buses_with_monitors += 1
                 for q in Q:
                     route = []
                     for ij, path in enumerate(A.keys()):
-                        if x_bqij[b, q, ij].X > 0.5:
+                        if x_bqij_x[b, q, ij] > 0.5:
                             route.append(path)
                     route_by_start = {path[0]: path for path in route}
                     route_destinations = {path[1] for path in route}
@@ -183,11 +188,11 @@ def get_rows() -> list[SamplingTable]:
                     total_distance += route_distance
 
             result = SamplingTable(
-                implementation=[b for b in range(len(B)) if z_b[b].X > 0.5],
+                implementation=[b for b in range(len(B)) if z_b_x[b] > 0.5],
                 fixed_functionality=[
                     student
                     for m, student in enumerate(problem_data.students)
-                    if any(a_mbq[m, b, q].X > 0.5 for b in range(len(B)) for q in Q)
+                    if any(a_mbq_x[m, b, q] > 0.5 for b in range(len(B)) for q in Q)
                 ],
                 minimal_resources=(
                     total_distance,
@@ -5,6 +5,11 @@ from typing import Any
 from gurobipy import GRB, Var, tupledict
 import yaml
 
+try:
+    from yaml import CDumper as Dumper
+except ImportError:
+    from yaml import Dumper
+
 
 from formulation.common import ProblemDataToy
 from formulation.formulation_3.gurobipy import (
@@ -92,11 +97,12 @@ def generate_routing_yaml():
     groups_of_students = get_all_combos(len(PROBLEM_DATA.students))
 
     for i, group in enumerate(groups_of_students):
+        # same students for every round count, so share one problem data copy
+        problem_data = replace(
+            PROBLEM_DATA, _students=tuple(PROBLEM_DATA.students[j] for j in group)
+        )
         for r in range(MAX_ROUNDS):
             guideline_name = f"guideline_{i}_{r}"
-            problem_data = replace(
-                PROBLEM_DATA, _students=[PROBLEM_DATA.students[j] for j in group]
-            )
             formulation = Formulation3(
                 problem_data=problem_data,
                 rounds=r + 1,
@@ -116,6 +122,10 @@ def generate_routing_yaml():
             x_bqij: tupledict[tuple[Any, ...], Var] = vals["x_bqij"]
             r_bmon: tupledict[tuple[Any, ...], Var] = vals["r_bmon"]
 
+            z_b_x = model.getAttr("X", z_b)
+            x_bqij_x = model.getAttr("X", x_bqij)
+            r_bmon_x = model.getAttr("X", r_bmon)
+
             total_distance = 0.0
             buses_with_monitors = 0
             buses_total = 0
@@ -123,17 +133,17 @@ def generate_routing_yaml():
             buses_with_wheelchair_access = 0
 
             for b, bus in enumerate(B):
-                if z_b[b].X > 0.5:
+                if z_b_x[b] > 0.5:
                     buses_total += 1
                     total_bus_capacity += bus.capacity
                     if bus.has_wheelchair_access:
                         buses_with_wheelchair_access += 1
-                    if r_bmon[b].X > 0.5:
+                    if r_bmon_x[b] > 0.5:
                         buses_with_monitors += 1
                 for q in Q:
                     route = []
                     for ij, path in enumerate(A.keys()):
-                        if x_bqij[b, q, ij].X > 0.5:
+                        if x_bqij_x[b, q, ij] > 0.5:
                             route.append(path)
                     route_by_start = {path[0]: path for path in route}
                     route_destinations = {path[1] for path in route}
@@ -194,10 +204,10 @@ def main() -> None:
     routing_yaml = generate_routing_yaml()
 
     with open(FLEET_OUTPUT, "w+", encoding="utf-8") as f:
-        yaml.dump(fleet_yaml, f)
+        yaml.dump(fleet_yaml, f, Dumper=Dumper)
 
     with open(ROUTING_OUTPUT, "w+", encoding="utf-8") as f:
-        yaml.dump(routing_yaml, f)
+        yaml.dump(routing_yaml, f, Dumper=Dumper)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import IntEnum
 from typing import NamedTuple
 
@@ -58,7 +58,8 @@ class LocationData(Base):
     i.e. stops, schools, depots, and students
     """
 
-    geographic_location: Point
+    geographic_location: Point = field(hash=False)
+    """not hashed since hashing shapely points is slow, still compared for equality"""
 
 
 @dataclass(frozen=True)
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
-from functools import cached_property
+from functools import cache, cached_property
 import os
 from pathlib import Path
 import warnings
@@ -12,8 +12,10 @@ import pickle
 import geopandas as gpd
 from matplotlib import pyplot as plt
 import networkx as nx
+import numpy as np
 import osmnx as ox
 import pandas as pd
+from scipy.sparse.csgraph import dijkstra
 
 from formulation.common.constants import NETWORK_TYPE
 from formulation.common.classes import (
@@ -28,7 +30,7 @@ from formulation.common.classes import (
     Student,
     Place,
 )
-from formulation.common.utils import get_shortest_path
+from formulation.common.utils import get_csgraph, get_shortest_path
 
 try:
     import r5py
@@ -225,56 +227,71 @@ class ProblemDataToy(ProblemData):
 
     @cached_property
     def service_graph(self):
-        service_graph: "nx.MultiDiGraph[NodeId]" = nx.MultiDiGraph()
-
-        def add_edge_if_path_exists(start: Place, end: Place):
-            # check if edge in graph already, if so skip
-            start_id = start.node_id
-            end_id = end.node_id
-
-            if service_graph.has_edge(start_id, end_id):
-                return
-
-            if start_id == end_id:
-                path = (start_id, end_id)
-                service_graph.add_edge(start_id, end_id, length=0.0, path=path)
-                return
-
-            try:
-                length, path_list = self._get_shortest_path_base(start_id, end_id)
-                path = tuple(path_list)
-                service_graph.add_edge(start_id, end_id, length=length, path=path)
-            except nx.NetworkXNoPath:
-                print(f"Warning: no path between {start} and {end} in the graph")
-
-        # Depots -> Stops
-        for depot in self.depots:
-            for stop in self.stops:
-                add_edge_if_path_exists(depot, stop)
-
-        # Stops -> Stops
-        # Stops -> Schools
-        for stop1 in self.stops:
-            for stop2 in self.stops:
-                if stop1 != stop2:
-                    add_edge_if_path_exists(stop1, stop2)
+        # copies made with dataclasses.replace (eg. subsets of students or buses)
+        # share the same graph and places, so they can share the service graph too
+        return _make_toy_service_graph(
+            self.base_graph, tuple(self.stops), tuple(self.schools), tuple(self.depots)
+        )
 
-            for school in self.schools:
-                add_edge_if_path_exists(stop1, school)
-
-        # Schools -> Stops
-        # Schools -> Schools
-        # Schools -> Depot
-        for school in self.schools:
-            for stop in self.stops:
-                add_edge_if_path_exists(school, stop)
-            for other_school in self.schools:
-                if school != other_school:
-                    add_edge_if_path_exists(school, other_school)
-            for depot in self.depots:
-                add_edge_if_path_exists(school, depot)
 
-        return service_graph
+@cache
+def _make_toy_service_graph(
+    base_graph: "nx.MultiDiGraph[NodeId]",
+    stops: tuple[Stop, ...],
+    schools: tuple[School, ...],
+    depots: tuple[Depot, ...],
+) -> "nx.MultiDiGraph[NodeId]":
+    """service graph between all toy places, see ProblemDataToy.service_graph"""
+    service_graph: "nx.MultiDiGraph[NodeId]" = nx.MultiDiGraph()
+
+    def add_edge_if_path_exists(start: Place, end: Place):
+        # check if edge in graph already, if so skip
+        start_id = start.node_id
+        end_id = end.node_id
+
+        if service_graph.has_edge(start_id, end_id):
+            return
+
+        if start_id == end_id:
+            path = (start_id, end_id)
+            service_graph.add_edge(start_id, end_id, length=0.0, path=path)
+            return
+
+        try:
+            length, path_list = get_shortest_path(base_graph, start_id, end_id)
+            path = tuple(path_list)
+            service_graph.add_edge(start_id, end_id, length=length, path=path)
+        except nx.NetworkXNoPath:
+            print(f"Warning: no path between {start} and {end} in the graph")
+
+    # Depots -> Stops
+    for depot in depots:
+        for stop in stops:
+            add_edge_if_path_exists(depot, stop)
+
+    # Stops -> Stops
+    # Stops -> Schools
+    for stop1 in stops:
+        for stop2 in stops:
+            if stop1 != stop2:
+                add_edge_if_path_exists(stop1, stop2)
+
+        for school in schools:
+            add_edge_if_path_exists(stop1, school)
+
+    # Schools -> Stops
+    # Schools -> Schools
+    # Schools -> Depot
+    for school in schools:
+        for stop in stops:
+            add_edge_if_path_exists(school, stop)
+        for other_school in schools:
+            if school != other_school:
+                add_edge_if_path_exists(school, other_school)
+        for depot in depots:
+            add_edge_if_path_exists(school, depot)
+
+    return service_graph
 
 
 @dataclass(frozen=True)
@@ -518,16 +535,16 @@ class ProblemDataReal(ProblemData):
             },
         )
         return_schools: list[School] = []
-        for _, row in schools_df.iterrows():
-            geographic_location = Point(row["lon"], row["lat"])
+        for row in schools_df.itertuples(index=False):
+            geographic_location = Point(row.lon, row.lat)
             nearest_node_id = self._get_nearest_node_id(geographic_location)
-            start_time = dt.datetime.strptime(row["start_time"], "%H:%M").time()
+            start_time = dt.datetime.strptime(row.start_time, "%H:%M").time()
             school = School(
-                id=row["id"],
-                name=row["name"],
+                id=row.id,
+                name=row.name,
                 node_id=nearest_node_id,
                 geographic_location=geographic_location,
-                type=SchoolType[row["type"]],
+                type=SchoolType[row.type],
                 start_time=start_time.hour * 60 + start_time.minute,
             )
             return_schools.append(school)
@@ -538,11 +555,11 @@ class ProblemDataReal(ProblemData):
             self.depots_path, dtype={"id": str, "lon": float, "lat": float}
         )
         return_depots: list[Depot] = []
-        for _, row in depots_df.iterrows():
-            geographic_location = Point(row["lon"], row["lat"])
+        for row in depots_df.itertuples(index=False):
+            geographic_location = Point(row.lon, row.lat)
             nearest_node_id = self._get_nearest_node_id(geographic_location)
             depot = Depot(
-                name=row["id"],
+                name=row.id,
                 node_id=nearest_node_id,
                 geographic_location=geographic_location,
             )
@@ -555,11 +572,11 @@ class ProblemDataReal(ProblemData):
         )
         return_stops: list[Stop] = []
 
-        for _, row in stops_df.iterrows():
-            geographic_location = Point(row["lon"], row["lat"])
+        for row in stops_df.itertuples(index=False):
+            geographic_location = Point(row.lon, row.lat)
             nearest_node_id = self._get_nearest_node_id(geographic_location)
             stop = Stop(
-                name=row["id"],
+                name=row.id,
                 node_id=nearest_node_id,
                 geographic_location=geographic_location,
             )
@@ -580,21 +597,24 @@ class ProblemDataReal(ProblemData):
         )
         return_students: list[Student] = []
 
-        for _, row in students_df.iterrows():
-            school = next(s for s in self.schools if s.id == row["school_id"])
-            geographic_location = Point(row["lon"], row["lat"])
+        # look schools up by id, keeping the first school for any repeated id
+        schools_by_id = {school.id: school for school in reversed(self.schools)}
+
+        for row in students_df.itertuples(index=False):
+            school = schools_by_id[row.school_id]
+            geographic_location = Point(row.lon, row.lat)
 
             # find nearest stop to student
             nearest_stop = self._get_nearest_stop(geographic_location)
 
             this_student = Student(
-                name=f"Student {row['id']}",
+                name=f"Student {row.id}",
                 geographic_location=geographic_location,
                 school=school,
                 stop=nearest_stop,
                 demographics=DemographicInfo(
-                    special_ed=bool(row["is_sp_ed"]),
-                    wheelchair_user=bool(row["is_wheelchair_user"]),
+                    special_ed=bool(row.is_sp_ed),
+                    wheelchair_user=bool(row.is_wheelchair_user),
                 ),
             )
             return_students.append(this_student)
@@ -616,18 +636,22 @@ class ProblemDataReal(ProblemData):
             },
         )
         return_buses: list[Bus] = []
-        for _, row in buses_df.iterrows():
-            depot = next(d for d in self.depots if d.name == row["depot_name"])
+
+        # look depots up by name, keeping the first depot for any repeated name
+        depots_by_name = {depot.name: depot for depot in reversed(self.depots)}
+
+        for row in buses_df.itertuples(index=False):
+            depot = depots_by_name[row.depot_name]
             bus = Bus(
-                id=row["id"],
-                name=row["num"],
-                capacity=row["capacity"],
-                range=row["range"],
+                id=row.id,
+                name=row.num,
+                capacity=row.capacity,
+                range=row.range,
                 depot=depot,
-                has_wheelchair_access=bool(row["has_wheelchair_access"]),
+                has_wheelchair_access=bool(row.has_wheelchair_access),
                 type=(
-                    BusType[row["type"]]
-                    if row.get("type") in BusType.__members__
+                    BusType[row.type]
+                    if getattr(row, "type", None) in BusType.__members__
                     else None
                 ),
             )
@@ -673,16 +697,46 @@ class ProblemDataReal(ProblemData):
         else:
             # Get nearest node in the OSM graph to the student's location
             nearest_node = self._get_nearest_node_id(geo_location)
-            distances = nx.single_source_dijkstra_path_length(
-                self.osm_graph, source=nearest_node, weight="length"
+            csgraph, _, node_to_idx = get_csgraph(self.osm_graph, "length")
+            node_idx = node_to_idx[nearest_node]
+
+            # if no stop is reachable, fall back to the first stop
+            nearest_distance = self._nearest_stop_distance[node_idx]
+            if np.isinf(nearest_distance):
+                return self.stops[0]
+
+            # only search as far as the nearest stop, with slack for float rounding
+            distances = dijkstra(
+                csgraph, indices=node_idx, limit=nearest_distance * (1 + 1e-9)
             )
-            all_stop_distances = {
-                stop: distances.get(stop.node_id, float("inf")) for stop in self.stops
-            }
+            stop_distances = np.where(
+                self._stop_node_idx >= 0,
+                distances[np.maximum(self._stop_node_idx, 0)],
+                np.inf,
+            )
+
+            # argmin keeps the first of equally near stops, like min() over stops
+            return self.stops[int(np.argmin(stop_distances))]
+
+    @cached_property
+    def _stop_node_idx(self) -> np.ndarray:
+        """index of each stop's node in get_csgraph, or -1 if it is not in the osm graph"""
+        _, _, node_to_idx = get_csgraph(self.osm_graph, "length")
+        return np.array([node_to_idx.get(stop.node_id, -1) for stop in self.stops])
+
+    @cached_property
+    def _nearest_stop_distance(self) -> np.ndarray:
+        """
+        network distance from every osm node (ordered like get_csgraph) to its nearest
+        stop, or inf if no stop is reachable
+        """
+        csgraph, nodes, _ = get_csgraph(self.osm_graph, "length")
+        stop_nodes = np.unique(self._stop_node_idx[self._stop_node_idx >= 0])
+        if len(stop_nodes) == 0:
+            return np.full(len(nodes), np.inf)
 
-            # find the stop with the minimum distance to the student
-            nearest_stop = min(all_stop_distances.items(), key=lambda item: item[1])[0]
-            return nearest_stop
+        # one dijkstra from all stops over reversed edges bounds every student's search
+        return dijkstra(csgraph.T, indices=stop_nodes, min_only=True)
 
 
 @dataclass(frozen=True)
@@ -710,7 +764,7 @@ class ProblemDataRealSurrogate(ProblemDataReal):
         prob_name = f"{name}_hex_problem_data"
         return cls.load_path(CURRENT_FILE_DIR / ".." / "cache" / f"{prob_name}.pkl")
 
-    @property
+    @cached_property
     def hex_graph(self) -> "nx.MultiDiGraph[tuple[int, int]]":
         """
         hexagonal lattice graph used for surrogate service graph construction,
@@ -772,33 +826,38 @@ class ProblemDataRealSurrogate(ProblemDataReal):
     @cached_property
     def base_graph(self) -> "nx.MultiDiGraph[NodeId]":
         hex_graph = self.hex_graph
+        mapping = self.mapping_hex_base
 
         base_graph: "nx.MultiDiGraph[NodeId]" = nx.MultiDiGraph()
-        for node, data in hex_graph.nodes.items():
-            base_graph.add_node(self.mapping_hex_base[node], **data)
-        for u, v, data in hex_graph.edges(data=True):
-            base_graph.add_edge(
-                self.mapping_hex_base[u], self.mapping_hex_base[v], **data
-            )
+        base_graph.add_nodes_from(
+            (mapping[node], data) for node, data in hex_graph.nodes.items()
+        )
+        base_graph.add_edges_from(
+            (mapping[u], mapping[v], data) for u, v, data in hex_graph.edges(data=True)
+        )
 
         return base_graph
 
+    @cached_property
+    def _hex_node_coords(self) -> tuple[tuple[tuple[int, int], ...], np.ndarray]:
+        """hex graph nodes and their (x, y) coordinates as an (n, 2) array, in the same order"""
+        hex_nodes = tuple(self.hex_graph.nodes())
+        coords = np.array(
+            [
+                (self.hex_graph.nodes[node]["x"], self.hex_graph.nodes[node]["y"])
+                for node in hex_nodes
+            ]
+        )
+        return hex_nodes, coords
+
     def _get_nearest_hex_node_id(self, geographic_location: Point) -> tuple[int, int]:
         """Get the nearest node in the hex graph to a given point."""
-        x = geographic_location.x
-        y = geographic_location.y
-
-        # find nearest hex node by using geographic coordinates
-        nearest_node = min(
-            self.hex_graph.nodes(),
-            key=lambda node: (
-                (self.hex_graph.nodes[node]["x"] - x) ** 2
-                + (self.hex_graph.nodes[node]["y"] - y) ** 2
-            )
-            ** 0.5,
-        )
+        hex_nodes, coords = self._hex_node_coords
 
-        return nearest_node
+        # find nearest hex node by using geographic coordinates (first one on ties, like min)
+        point = (geographic_location.x, geographic_location.y)
+        squared_distances = ((coords - point) ** 2).sum(axis=1)
+        return hex_nodes[int(np.argmin(squared_distances))]
 
     def _make_stops(self):
         # rather than make multiple stops assigned to the same hex node,
@@ -819,17 +878,20 @@ class ProblemDataRealSurrogate(ProblemDataReal):
             stops.append(new_stop)
         return tuple(stops)
 
-    def _get_nearest_stop(self, geo_location):
-        stop_locations = [stop.geographic_location for stop in self.stops]
-        nearest_stop_location = min(
-            stop_locations,
-            key=lambda loc: (
-                (loc.x - geo_location.x) ** 2 + (loc.y - geo_location.y) ** 2
-            )
-            ** 0.5,
+    @cached_property
+    def _stop_coords(self) -> np.ndarray:
+        """(x, y) coordinates of the stops as an (n, 2) array, in the order of stops"""
+        return np.array(
+            [
+                (stop.geographic_location.x, stop.geographic_location.y)
+                for stop in self.stops
+            ]
         )
 
-        # get stop assigned to this hex node
-        for stop in self.stops:
-            if stop.geographic_location == nearest_stop_location:
-                return stop
+    def _get_nearest_stop(self, geo_location):
+        coords = self._stop_coords
+        point = (geo_location.x, geo_location.y)
+        squared_distances = ((coords - point) ** 2).sum(axis=1)
+
+        # argmin picks the first stop at the nearest location, ie. the stop assigned to this hex node
+        return self.stops[int(np.argmin(squared_distances))]
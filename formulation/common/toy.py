@@ -1,4 +1,3 @@
-from typing import cast
 import random
 
 import networkx as nx
@@ -28,21 +27,20 @@ random.seed(42)  # for reproducibility <3
 
 
 def make_graph(size: tuple[int, int] = (10, 10)) -> "nx.MultiDiGraph[NodeId]":
-    graph_2d = nx.grid_2d_graph(size[0], size[1], create_using=nx.MultiDiGraph)
-    graph_2d = cast("nx.MultiDiGraph[tuple[int, int]]", graph_2d)
-    # Add weights to the edges
-    for u, v in graph_2d.edges():
-        graph_2d.edges[u, v, 0]["length"] = 1.0  # 1 km between adjacent nodes
+    rows, cols = size
 
     graph: "nx.MultiDiGraph[NodeId]" = nx.MultiDiGraph()
-    mapping: dict[tuple[int, int], NodeId] = {}
-    for i, node in enumerate(graph_2d.nodes()):
-        mapping[node] = i
-        x = node[0]
-        y = node[1]
-        graph.add_node(i, x=x, y=y)
-    for u, v in graph_2d.edges():
-        graph.add_edge(mapping[u], mapping[v], length=graph_2d.edges[u, v, 0]["length"])
+    graph.add_nodes_from(
+        (i * cols + j, {"x": i, "y": j}) for i in range(rows) for j in range(cols)
+    )
+    # neighbours in node id order, matching a relabelled nx.grid_2d_graph
+    graph.add_edges_from(
+        (i * cols + j, ni * cols + nj, {"length": 1.0})  # 1 km between adjacent nodes
+        for i in range(rows)
+        for j in range(cols)
+        for ni, nj in ((i - 1, j), (i, j - 1), (i, j + 1), (i + 1, j))
+        if 0 <= ni < rows and 0 <= nj < cols
+    )
 
     return graph
 
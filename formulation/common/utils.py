@@ -3,6 +3,8 @@ from functools import cache
 from collections.abc import Hashable
 
 import networkx as nx
+import numpy as np
+from scipy.sparse import csr_array
 
 from formulation.common.classes import Place, School, Bus, Student, Depot
 
@@ -27,6 +29,56 @@ def make_depot_start_copy(depot: Depot) -> Depot:
     return make_place_copy(depot, "start copy")
 
 
+@cache
+def get_edge_index[T: Hashable](
+    graph: "nx.MultiDiGraph[T]",
+) -> dict[tuple[T, T], dict]:
+    """returns the data of the first (key 0) edge between each (u, v) in the graph"""
+    return {
+        (u, v): data
+        for u, v, key, data in graph.edges(keys=True, data=True)
+        if key == 0
+    }
+
+
+@cache
+def get_csgraph[T: Hashable](
+    graph: "nx.MultiDiGraph[T]", weight: str = "length"
+) -> tuple[csr_array, tuple[T, ...], dict[T, int]]:
+    """returns the graph as a scipy csr adjacency matrix, with its node order and node -> index map"""
+    nodes = tuple(graph.nodes)
+    node_to_idx = {node: idx for idx, node in enumerate(nodes)}
+
+    num_edges = graph.number_of_edges()
+    rows = np.fromiter(
+        (node_to_idx[u] for u, _ in graph.edges()), dtype=np.int32, count=num_edges
+    )
+    cols = np.fromiter(
+        (node_to_idx[v] for _, v in graph.edges()), dtype=np.int32, count=num_edges
+    )
+    weights = np.fromiter(
+        (data.get(weight, 1) for _, _, data in graph.edges(data=True)),
+        dtype=float,
+        count=num_edges,
+    )
+
+    # drop self loops
+    keep = rows != cols
+    rows, cols, weights = rows[keep], cols[keep], weights[keep]
+
+    # keep only the cheapest of any parallel edges, like networkx does
+    order = np.lexsort((weights, cols, rows))
+    rows, cols, weights = rows[order], cols[order], weights[order]
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+
+    csgraph = csr_array(
+        (weights[first], (rows[first], cols[first])),
+        shape=(len(nodes), len(nodes)),
+    )
+    return csgraph, nodes, node_to_idx
+
+
 @cache
 def get_shortest_path[T: Hashable](
     graph: "nx.MultiDiGraph[T]", start: T, end: T, weight: str = "length"
@@ -41,8 +41,6 @@ def build_model_from_definition(
     M_TIME = problem.M_TIME
     M_CAPACITY = problem.M_CAPACITY
     ALPHA = problem.ALPHA
-    t_ij = problem.t_ij
-    d_ij = problem.d_ij
     T_horizon = problem.T_horizon
     EPSILON = problem.EPSILON
     H_RIDE = problem.H_RIDE
@@ -90,32 +88,44 @@ def build_model_from_definition(
     )  # 1 if bus b as a monitor (ie serves a flagged student)
 
     # Precompute some index structures
-    # A_list = list(A.keys())  # ordered arcs
-    # num_A = len(A_list)
-
-    # adjacency from N to arcs (boolean masks)
-    # starts_at = {
-    #     i: np.array([int(path[0] == node) for path in A_list])
-    #     for i, node in enumerate(N)
-    # }
-    # ends_at = {
-    #     i: np.array([int(path[1] == node) for path in A_list])
-    #     for i, node in enumerate(N)
-    # }
+    node_to_idx = {node: idx for idx, node in enumerate(N)}
+    school_to_idx = {school: idx for idx, school in enumerate(S)}
+    student_to_idx = {student: idx for idx, student in enumerate(M)}
+    school_type_to_idx = {school_type: idx for idx, school_type in enumerate(TAU)}
 
     P_set = set(P)
-    # S_set = set(S)
+    S_set = set(S)
 
     pickup_idx = [i for i, n in enumerate(N) if n in P_set]
-    # school_idx = [i for i, n in enumerate(N) if n in S_set]
+    school_idx = [i for i, n in enumerate(N) if n in S_set]
+    service_idx = [i for i, n in enumerate(N) if n in P_set or n in S_set]
+
+    # per-bus data, indexed by position in B
+    depot_start_by_bus = [make_depot_start_copy(depot_b(bus)) for bus in B]
+    depot_end_by_bus = [make_depot_end_copy(depot_b(bus)) for bus in B]
+    capacity_by_bus = [C_b(bus) for bus in B]
+    range_by_bus = [R_b(bus) for bus in B]
+    wheelchair_by_bus = [Wh_b(bus) for bus in B]
+    cap_upper_by_bus = [C_CAP_B(bus) for bus in B]
+
+    # arc endpoints and adjacency from N to arcs, as index arrays into A
+    arc_start_idx = np.array([node_to_idx[path[0]] for path in A], dtype=int)
+    arc_end_idx = np.array([node_to_idx[path[1]] for path in A], dtype=int)
+    arcs_from = {i: np.flatnonzero(arc_start_idx == i) for i in range(len(N))}
+    arcs_to = {i: np.flatnonzero(arc_end_idx == i) for i in range(len(N))}
+
+    school_copy_idx = [node_to_idx[school_copy] for school_copy in S_PLUS]
+    school_copy_start_arcs = np.flatnonzero(np.isin(arc_start_idx, school_copy_idx))
+    depot_start_arcs_by_bus = [arcs_from[node_to_idx[d]] for d in depot_start_by_bus]
+    depot_end_arcs_by_bus = [arcs_to[node_to_idx[d]] for d in depot_end_by_bus]
 
     # student -> pickup/school node index in N
-    p_idx = np.array([N.index(p_m(st)) for st in M])
-    s_idx = np.array([N.index(s_m(st)) for st in M])
+    p_idx = np.array([node_to_idx[p_m(st)] for st in M])
+    s_idx = np.array([node_to_idx[s_m(st)] for st in M])
 
     # for each node, which students pick up / drop off there
     M_p = {i: np.where(p_idx == i)[0] for i in range(len(N))}
-    # M_s = {i: np.where(s_idx == i)[0] for i in range(len(N))}
+    M_s = {i: np.where(s_idx == i)[0] for i in range(len(N))}
 
     M_idx = np.arange(len(M))
     B_idx = np.arange(len(B))
@@ -124,9 +134,21 @@ def build_model_from_definition(
     # broadcast to grids of indices (M,B,Q)
     M_grid, B_grid, Q_grid = np.meshgrid(M_idx, B_idx, Q_idx, indexing="ij")
 
+    # students boarding / alighting at each node per bus and round, built once and
+    # shared by the time, school arrival and load constraints over every arc
+    boarding_bqi = [
+        [[cp.sum(a_mbq[M_p[i], b, q]) for i in range(len(N))] for q in range(len(Q))]
+        for b in range(len(B))
+    ]
+    alighting_bqi = [
+        [[cp.sum(a_mbq[M_s[i], b, q]) for i in range(len(N))] for q in range(len(Q))]
+        for b in range(len(B))
+    ]
+
     # HEAD HONCHO OBJECTIVE AND CONSTRAINTS
 
-    distance_array = np.array([d_ij(i, j) for (i, j) in A.keys()])
+    distance_by_arc, travel_time_by_arc = problem.arc_costs()
+    distance_array = np.array(distance_by_arc)
 
     objective = cp.Minimize(
         cp.sum(cp.sum(cp.multiply(x_bqij, distance_array), axis=2))
@@ -158,30 +180,14 @@ def build_model_from_definition(
 
     # ROUTING / TOUR STRUCTURE
 
-    for b, bus in enumerate(B):
+    for b in range(len(B)):
         constraints.append(
-            cp.sum(
-                [
-                    x_bqij[b, 0, ij]
-                    for ij, path in enumerate(A.keys())
-                    if path[0] == make_depot_start_copy(depot_b(bus))
-                ]
-            )
-            == z_bq[b, 0]
+            cp.sum(x_bqij[b, 0, depot_start_arcs_by_bus[b]]) == z_bq[b, 0]
         )
 
-    for b, bus in enumerate(B):
+    for b in range(len(B)):
         for q in range(1, len(Q)):
-            constraints.append(
-                cp.sum(
-                    [
-                        x_bqij[b, q, ij]
-                        for ij, path in enumerate(A.keys())
-                        if path[0] == make_depot_start_copy(depot_b(bus))
-                    ]
-                )
-                == 0
-            )
+            constraints.append(cp.sum(x_bqij[b, q, depot_start_arcs_by_bus[b]]) == 0)
 
     # round-end school selection (if next round is used, current round must end at exactly one school)
     for b in range(len(B)):
@@ -193,91 +199,37 @@ def build_model_from_definition(
     for b in range(len(B)):
         for s in range(len(S)):
             # don't use school copy nodes for round 0
-            s_plus_set = set(S_PLUS)
-            constraints.append(
-                cp.sum(
-                    [
-                        x_bqij[b, 0, ij]
-                        for ij, path in enumerate(A.keys())
-                        if path[0] in s_plus_set
-                    ]
-                )
-                == 0
-            )
+            constraints.append(cp.sum(x_bqij[b, 0, school_copy_start_arcs]) == 0)
             # if round q > 0 starts at school copy s^+, then round q-1 must end at school s
             for q in range(1, len(Q)):
                 constraints.append(
-                    cp.sum(
-                        [
-                            x_bqij[b, q, ij]
-                            for ij, path in enumerate(A.keys())
-                            if path[0] == S_PLUS[s]
-                        ]
-                    )
+                    cp.sum(x_bqij[b, q, arcs_from[school_copy_idx[s]]])
                     == e_bqs[b, q - 1, s]
                 )
             for q in range(len(Q)):
                 # don't let paths end at school copy s^+
                 constraints.append(
-                    cp.sum(
-                        [
-                            x_bqij[b, q, ij]
-                            for ij, path in enumerate(A.keys())
-                            if path[1] == S_PLUS[s]
-                        ]
-                    )
-                    == 0
+                    cp.sum(x_bqij[b, q, arcs_to[school_copy_idx[s]]]) == 0
                 )
 
-    for b, bus in enumerate(B):
+    for b in range(len(B)):
         for q in range(len(Q) - 1):
             constraints.append(
-                cp.sum(
-                    [
-                        x_bqij[b, q, ij]
-                        for ij, path in enumerate(A.keys())
-                        if path[1] == make_depot_end_copy(depot_b(bus))
-                    ]
-                )
+                cp.sum(x_bqij[b, q, depot_end_arcs_by_bus[b]])
                 == z_bq[b, q] - z_bq[b, q + 1]
             )
-    for b, bus in enumerate(B):
+    for b in range(len(B)):
         constraints.append(
-            cp.sum(
-                [
-                    x_bqij[b, len(Q) - 1, ij]
-                    for ij, path in enumerate(A.keys())
-                    if path[1] == make_depot_end_copy(depot_b(bus))
-                ]
-            )
+            cp.sum(x_bqij[b, len(Q) - 1, depot_end_arcs_by_bus[b]])
             == z_bq[b, len(Q) - 1]
         )
 
     # flow conservation at pickup stops
     for b in range(len(B)):
         for q in range(len(Q)):
-            for i, node in enumerate(N):
-                if node in P:
-                    constraints.append(
-                        cp.sum(
-                            [
-                                x_bqij[b, q, ij]
-                                for ij, path in enumerate(A.keys())
-                                if path[0] == node
-                            ]
-                        )
-                        == v_bqi[b, q, i]
-                    )
-                    constraints.append(
-                        cp.sum(
-                            [
-                                x_bqij[b, q, ij]
-                                for ij, path in enumerate(A.keys())
-                                if path[1] == node
-                            ]
-                        )
-                        == v_bqi[b, q, i]
-                    )
+            for i in pickup_idx:
+                constraints.append(cp.sum(x_bqij[b, q, arcs_from[i]]) == v_bqi[b, q, i])
+                constraints.append(cp.sum(x_bqij[b, q, arcs_to[i]]) == v_bqi[b, q, i])
 
     # Stop visit only if someone is assigned from that stop in that round
     for i in pickup_idx:
@@ -292,62 +244,35 @@ def build_model_from_definition(
     # flow conservation at schools (allow school to be end of a non-last round via e_{b,q,s})
     for b in range(len(B)):
         for q in range(len(Q)):
-            for i, node in enumerate(N):
-                if node in S:
-                    assert isinstance(node, type(S[0]))
-                    constraints.append(
-                        cp.sum(
-                            [
-                                x_bqij[b, q, ij]
-                                for ij, path in enumerate(A.keys())
-                                if path[1] == node
-                            ]
-                        )
-                        == v_bqi[b, q, i]
-                    )
-                    constraints.append(
-                        cp.sum(
-                            [
-                                x_bqij[b, q, ij]
-                                for ij, path in enumerate(A.keys())
-                                if path[0] == node
-                            ]
-                        )
-                        == v_bqi[b, q, i] - e_bqs[b, q, S.index(node)]
-                    )
+            for i in school_idx:
+                constraints.append(cp.sum(x_bqij[b, q, arcs_to[i]]) == v_bqi[b, q, i])
+                constraints.append(
+                    cp.sum(x_bqij[b, q, arcs_from[i]])
+                    == v_bqi[b, q, i] - e_bqs[b, q, school_to_idx[N[i]]]
+                )
 
     for b in range(len(B)):
         for q in range(len(Q)):
-            for i, node in enumerate(N):
-                if node in S or node in P:
-                    constraints.append(v_bqi[b, q, i] <= z_bq[b, q])
+            for i in service_idx:
+                constraints.append(v_bqi[b, q, i] <= z_bq[b, q])
 
     # Each assigned student forces visiting their pickup and their school (in the same round)
     constraints.append(a_mbq <= v_bqi[B_grid, Q_grid, p_idx[M_grid]])
     constraints.append(a_mbq <= v_bqi[B_grid, Q_grid, s_idx[M_grid]])
 
     # TIME ANCHORING
-    for b, bus in enumerate(B):
-        bus_depot = depot_b(bus)
-        # make start copy of depot for time anchoring
-        bus_start_depot = make_depot_start_copy(bus_depot)
-        constraints.append(T_bqi[b, 0, N.index(bus_start_depot)] == 0)
+    for b in range(len(B)):
+        # start copy of depot for time anchoring
+        constraints.append(T_bqi[b, 0, node_to_idx[depot_start_by_bus[b]]] == 0)
 
     # round-to-round time chaining (start next round at s^+ after finishing previous round at s)
     for b in range(len(B)):
         for q in range(1, len(Q)):
             for s, school in enumerate(S):
                 constraints.append(
-                    T_bqi[b, q, N.index(S_PLUS[s])]
-                    >= T_bqi[b, q - 1, N.index(school)]
-                    + BETA
-                    * cp.sum(
-                        [
-                            a_mbq[m, b, q - 1]
-                            for m, student in enumerate(M)
-                            if s_m(student) == school
-                        ]
-                    )
+                    T_bqi[b, q, node_to_idx[S_PLUS[s]]]
+                    >= T_bqi[b, q - 1, node_to_idx[school]]
+                    + BETA * alighting_bqi[b][q - 1][node_to_idx[school]]
                     - M_TIME * (1 - e_bqs[b, q - 1, s])
                 )
 
@@ -356,27 +281,13 @@ def build_model_from_definition(
     # with explicit dwell times
     for b in range(len(B)):
         for q in range(len(Q)):
-            for ij, path in enumerate(A):
+            for ij in range(len(A)):
                 constraints.append(
-                    T_bqi[b, q, N.index(path[1])]
-                    >= T_bqi[b, q, N.index(path[0])]
-                    + t_ij(*path)
-                    + ALPHA
-                    * cp.sum(
-                        [
-                            a_mbq[m, b, q]
-                            for m, student in enumerate(M)
-                            if p_m(student) == path[0]
-                        ]
-                    )
-                    + BETA
-                    * cp.sum(
-                        [
-                            a_mbq[m, b, q]
-                            for m, student in enumerate(M)
-                            if s_m(student) == path[0]
-                        ]
-                    )
+                    T_bqi[b, q, arc_end_idx[ij]]
+                    >= T_bqi[b, q, arc_start_idx[ij]]
+                    + travel_time_by_arc[ij]
+                    + ALPHA * boarding_bqi[b][q][arc_start_idx[ij]]
+                    + BETA * alighting_bqi[b][q][arc_start_idx[ij]]
                     - M_TIME * (1 - x_bqij[b, q, ij])
                 )
 
@@ -387,16 +298,9 @@ def build_model_from_definition(
         for q in range(len(Q)):
             for school in S:
                 constraints.append(
-                    T_bqi[b, q, N.index(school)]
-                    + BETA
-                    * cp.sum(
-                        [
-                            a_mbq[m, b, q]
-                            for m, student in enumerate(M)
-                            if s_m(student) == school
-                        ]
-                    )
-                    <= l_s(school) + M_TIME * (1 - v_bqi[b, q, N.index(school)])
+                    T_bqi[b, q, node_to_idx[school]]
+                    + BETA * alighting_bqi[b][q][node_to_idx[school]]
+                    <= l_s(school) + M_TIME * (1 - v_bqi[b, q, node_to_idx[school]])
                 )
 
     # PICKUP BEFORE DROPOFF AND MAX RIDE TIME
@@ -405,104 +309,72 @@ def build_model_from_definition(
         for q in range(len(Q)):
             for m, student in enumerate(M):
                 constraints.append(
-                    T_bqi[b, q, N.index(s_m(student))]
-                    >= T_bqi[b, q, N.index(p_m(student))]
+                    T_bqi[b, q, node_to_idx[s_m(student)]]
+                    >= T_bqi[b, q, node_to_idx[p_m(student)]]
                     + EPSILON
                     - M_TIME * (1 - a_mbq[m, b, q])
                 )
                 constraints.append(
-                    T_bqi[b, q, N.index(s_m(student))]
-                    - T_bqi[b, q, N.index(p_m(student))]
+                    T_bqi[b, q, node_to_idx[s_m(student)]]
+                    - T_bqi[b, q, node_to_idx[p_m(student)]]
                     <= H_RIDE + M_TIME * (1 - a_mbq[m, b, q])
                 )
 
     # DISTANCE RANGE CONSTRAINTS
 
-    for b, bus in enumerate(B):
-        constraints.append(
-            cp.sum([d_ij(*path) * x_bqij[b, :, ij] for ij, path in enumerate(A.keys())])
-            <= R_b(bus) * z_b[b]
-        )
+    # distance of each round within the bus range, for every (b, q) at once
+    constraints.append(
+        cp.sum(cp.multiply(x_bqij, distance_array), axis=2)
+        <= cp.reshape(cp.multiply(np.array(range_by_bus), z_b), (len(B), 1), order="C")
+    )
 
     # LOAD / CAPACITY CONSTRAINTS PER ROUND
 
-    for b, bus in enumerate(B):
-        depot_start = make_depot_start_copy(depot_b(bus))
-        depot_end = make_depot_end_copy(depot_b(bus))
+    for b in range(len(B)):
+        depot_start = depot_start_by_bus[b]
+        depot_end = depot_end_by_bus[b]
         # load at beginning is 0
-        constraints.append(L_bqi[b, 0, N.index(depot_start)] == 0)
+        constraints.append(L_bqi[b, 0, node_to_idx[depot_start]] == 0)
 
         for q in range(len(Q)):
-            constraints.append(L_bqi[b, q, N.index(depot_end)] == 0)
+            constraints.append(L_bqi[b, q, node_to_idx[depot_end]] == 0)
 
         for q in range(len(Q)):
             for s, school in enumerate(S):
-                constraints.append(L_bqi[b, q, N.index(S_PLUS[s])] == 0)
+                constraints.append(L_bqi[b, q, node_to_idx[S_PLUS[s]]] == 0)
 
         for q in range(len(Q)):
             for ij, path in enumerate(A):
                 # if a round ends at school s, the bus must be empty after servicing s
                 constraints.append(
-                    L_bqi[b, q, N.index(path[1])]
-                    >= L_bqi[b, q, N.index(path[0])]
-                    + cp.sum(
-                        [
-                            a_mbq[m, b, q]
-                            for m, student in enumerate(M)
-                            if p_m(student) == path[1]
-                        ]
-                    )
-                    - cp.sum(
-                        [
-                            a_mbq[m, b, q]
-                            for m, student in enumerate(M)
-                            if s_m(student) == path[1]
-                        ]
-                    )
+                    L_bqi[b, q, arc_end_idx[ij]]
+                    >= L_bqi[b, q, arc_start_idx[ij]]
+                    + boarding_bqi[b][q][arc_end_idx[ij]]
+                    - alighting_bqi[b][q][arc_end_idx[ij]]
                     - M_CAPACITY * (1 - x_bqij[b, q, ij])
                 )
                 constraints.append(
-                    L_bqi[b, q, N.index(path[1])]
-                    <= L_bqi[b, q, N.index(path[0])]
-                    + cp.sum(
-                        [
-                            a_mbq[m, b, q]
-                            for m, student in enumerate(M)
-                            if p_m(student) == path[1]
-                        ]
-                    )
-                    - cp.sum(
-                        [
-                            a_mbq[m, b, q]
-                            for m, student in enumerate(M)
-                            if s_m(student) == path[1]
-                        ]
-                    )
+                    L_bqi[b, q, arc_end_idx[ij]]
+                    <= L_bqi[b, q, arc_start_idx[ij]]
+                    + boarding_bqi[b][q][arc_end_idx[ij]]
+                    - alighting_bqi[b][q][arc_end_idx[ij]]
                     + M_CAPACITY * (1 - x_bqij[b, q, ij])
                 )
                 # if a round ends at school s, the bus must be empty after servicing s
-        for q in range(len(Q)):
-            for i in range(len(N)):
-                constraints.append(
-                    L_bqi[b, q, i]
-                    <= C_b(bus)
-                    * cp.sum(
-                        [
-                            KAPPA[school_type] * y_bqtau[b, q, tau]
-                            for tau, school_type in enumerate(TAU)
-                        ]
-                    )
-                )
-        for q in range(len(Q)):
-            for i in range(len(N)):
-                constraints.append(L_bqi[b, q, i] >= 0)
 
         for q in range(len(Q)):
             for s, school in enumerate(S):
                 constraints.append(
-                    L_bqi[b, q, N.index(school)] <= C_CAP_B(bus) * (1 - e_bqs[b, q, s])
+                    L_bqi[b, q, node_to_idx[school]]
+                    <= cap_upper_by_bus[b] * (1 - e_bqs[b, q, s])
                 )
 
+    # load at every node is within the bus capacity for its type, for all (b, q, i) at once
+    kappa_array = np.array([KAPPA[school_type] for school_type in TAU])
+    capacity_bq = cp.multiply(np.array(capacity_by_bus)[:, None], y_bqtau @ kappa_array)
+    constraints.append(L_bqi <= cp.reshape(capacity_bq, (len(B), len(Q), 1), order="C"))
+    constraints.append(L_bqi >= 0)
+
     # MONITOR FEASIBILITY PER BUS
 
     for b in range(len(B)):
@@ -516,15 +388,17 @@ def build_model_from_definition(
             )
             # If a flag student is on the bus, there should be one monitor
             for flagged in F:
-                constraints.append(r_bmon[b] >= a_mbq[M.index(flagged), b, q])
+                constraints.append(r_bmon[b] >= a_mbq[student_to_idx[flagged], b, q])
 
     # WHEELCHAIR CONSTRAINTS
 
     # if a student requiring a wheelchair is assigned a bus, the bus must be wheelchair-accessible
     for m, student in enumerate(W):
-        for b, bus in enumerate(B):
+        for b in range(len(B)):
             for q in range(len(Q)):
-                constraints.append(a_mbq[M.index(student), b, q] <= Wh_b(bus))
+                constraints.append(
+                    a_mbq[student_to_idx[student], b, q] <= wheelchair_by_bus[b]
+                )
 
     # SCHOOL LEVEL
 
@@ -535,7 +409,7 @@ def build_model_from_definition(
             constraints.append(cp.sum(y_bqtau[b, q, :]) == z_bq[b, q])
             for m, student in enumerate(M):
                 constraints.append(
-                    a_mbq[m, b, q] <= y_bqtau[b, q, TAU.index(tau_m(student))]
+                    a_mbq[m, b, q] <= y_bqtau[b, q, school_type_to_idx[tau_m(student)]]
                 )
 
     return cp.Problem(objective, constraints), {
@@ -588,7 +462,6 @@ def make_report(
 
     B = formulation.B
     M = formulation.M
-    S = formulation.S
     A = formulation.A
     Q = formulation.Q
 
@@ -603,52 +476,61 @@ def make_report(
     # e_bqs = model_vars["e_bqs"]
     r_bmon = model_vars["r_bmon"]
 
-    result_string = ""
+    result_lines: list[str] = []
 
     if prob.status not in [cp.OPTIMAL, cp.OPTIMAL_INACCURATE]:
-        result_string += (
+        result_lines.append(
             f"⚠️ Solver did not find a feasible solution (status={prob.status}).\n"
         )
     else:
+        z_bq_value = z_bq.value
+        y_bqtau_value = y_bqtau.value
+        x_bqij_value = x_bqij.value
+        a_mbq_value = a_mbq.value
+        r_bmon_value = r_bmon.value
+        assert z_bq_value is not None
+
+        A_list = list(A.keys())
+
         for b, bus in enumerate(B):
-            result_string += f"{bus} (capacity {C_b(bus)}, range {R_b(bus)}, wheelchair access {Wh_b(bus) == 1}, monitor needed: {r_bmon[b].value > 0.5})\n"
+            result_lines.append(
+                f"{bus} (capacity {C_b(bus)}, range {R_b(bus)}, wheelchair access {Wh_b(bus) == 1}, monitor needed: {r_bmon_value[b] > 0.5})\n"
+            )
             for q in range(len(Q)):
-                assert z_bq[b, q].value is not None
-                if z_bq[b, q].value > 0.5:
-                    result_string += f"  Round {q}:\n"
+                if z_bq_value[b, q] > 0.5:
+                    result_lines.append(f"  Round {q}:\n")
                     route = []
-                    students_on_bus = []
+                    students_on_bus = [
+                        M[m] for m in np.flatnonzero(a_mbq_value[:, b, q] > 0.5)
+                    ]
+                    schools_of_students = {s_m(student) for student in students_on_bus}
                     schools_served = []
-                    for ij, path in enumerate(A.keys()):
-                        if x_bqij[b, q, ij].value > 0.5:
-                            route.append(path)
-                            for node in path:
-                                if (
-                                    node in S
-                                    and node not in schools_served
-                                    and any(
-                                        a_mbq[m, b, q].value > 0.5 and s_m(M[m]) == node
-                                        for m in range(len(M))
-                                    )
-                                ):
-                                    schools_served.append(node)
-                    for m, student in enumerate(M):
-                        if a_mbq[m, b, q].value > 0.5:
-                            students_on_bus.append(student)
-                    result_string += f"    Total travel time (excluding dwell): {sum(formulation.d_ij(*path) for path in route):.2f} minutes\n"
+                    for ij in np.flatnonzero(x_bqij_value[b, q] > 0.5):
+                        path = A_list[ij]
+                        route.append(path)
+                        for node in path:
+                            if (
+                                node in schools_of_students
+                                and node not in schools_served
+                            ):
+                                schools_served.append(node)
+                    result_lines.append(
+                        f"    Total travel time (excluding dwell): {sum(formulation.d_ij(*path) for path in route):.2f} minutes\n"
+                    )
                     school_type = TAU[
-                        max(
-                            (tau for tau in range(len(TAU))),
-                            key=lambda tau: (
-                                y_bqtau[b, q, tau].value
-                                if y_bqtau[b, q, tau].value is not None
-                                else 0
-                            ),
+                        (
+                            int(np.argmax(y_bqtau_value[b, q]))
+                            if y_bqtau_value is not None
+                            else 0
                         )
                     ]
-                    result_string += f"    Bus type: {school_type.name}\n"
-                    result_string += f"    Students on bus this round:\n      {'\n      '.join(str(student) for student in students_on_bus)}\n"
-                    result_string += f"    Schools served:\n      {'\n      '.join(str(school) for school in schools_served)}\n"
+                    result_lines.append(f"    Bus type: {school_type.name}\n")
+                    result_lines.append(
+                        f"    Students on bus this round:\n      {'\n      '.join(str(student) for student in students_on_bus)}\n"
+                    )
+                    result_lines.append(
+                        f"    Schools served:\n      {'\n      '.join(str(school) for school in schools_served)}\n"
+                    )
 
                     # Sort route by travel time from depot start
                     # depot_start = make_depot_start_copy(depot_b(bus))
@@ -663,11 +545,11 @@ def make_report(
                     #             current_node = path[1]
                     #             break
 
-                    result_string += "    Route:\n"
+                    result_lines.append("    Route:\n")
                     for path in route:
-                        result_string += f"      {path[0]} -> {path[1]}\n"
+                        result_lines.append(f"      {path[0]} -> {path[1]}\n")
 
-    return result_string
+    return "".join(result_lines)
 
 
 def plot_bus_routes(
@@ -711,12 +593,16 @@ def plot_bus_routes(
     else:
         # Visualize the routes on the graph
 
+        z_bq_value = z_bq.value
+        x_bqij_value = x_bqij.value
+        assert z_bq_value is not None and x_bqij_value is not None
+
         fig, ax = ox.plot_graph(graph, show=False)
         for b, _ in enumerate(B):
             for q in range(len(Q)):
-                if z_bq[b, q].value > 0.5:
+                if z_bq_value[b, q] > 0.5:
                     for ij, path in enumerate(A.keys()):
-                        if x_bqij[b, q, ij].value > 0.5:
+                        if x_bqij_value[b, q, ij] > 0.5:
                             path_edges = A_PATH[path]
                             if path_edges:
                                 ox.plot_graph_route(
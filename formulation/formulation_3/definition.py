@@ -16,6 +16,7 @@ from formulation.common.classes import (
 from formulation.common.problems import ProblemData, ProblemDataReal
 from formulation.common.utils import (
     C_b,
+    get_edge_index,
     l_s,
     make_depot_end_copy,
     make_depot_start_copy,
@@ -198,6 +199,8 @@ class Formulation3:
         init=False, default_factory=dict
     )
     """arc shortest paths"""
+    A_TIME: dict[tuple[Place, Place], float] = field(init=False, default_factory=dict)
+    """arc travel times in minutes, filled in lazily by t_ij"""
     Q: tuple[int, ...] = field(init=False, default_factory=tuple)
     """rounds a bus is allowed to have"""
     Q_MAX: int = field(init=False)
@@ -210,6 +213,8 @@ class Formulation3:
     """big M for capacity constraints, set to max bus capacity"""
     M_TYPE: SchoolType = field(init=False)
     """big M for bus type constraints, set to max school type"""
+    KAPPA_MAX: float = field(init=False)
+    """largest capacity multiplier over the school types present, used by C_CAP_B"""
 
     # derived vals
     T_horizon: float = field(init=False)
@@ -255,28 +260,45 @@ class Formulation3:
 
         self.A = {}
         self.A_PATH = {}
-
-        for i in self.N:
-            for j in self.N:
-                if i == j or i.node_id == j.node_id:
-                    continue
-
-                ij_edge_data = self.problem_data.service_graph.get_edge_data(
-                    i.node_id, j.node_id, key=0, default=None
-                )
-                if ij_edge_data is not None:
-                    self.A[i, j] = ij_edge_data["length"]
-                    self.A_PATH[i, j] = ij_edge_data["path"]
+        self.A_TIME = {}
+
+        # walk the service graph edges instead of every (i, j) pair of N, then sort
+        # so arcs keep the same (i, j) order as a double loop over N
+        service_edges = get_edge_index(self.problem_data.service_graph)
+        nodes_by_id: dict[NodeId, list[int]] = {}
+        for idx, node in enumerate(self.N):
+            nodes_by_id.setdefault(node.node_id, []).append(idx)
+
+        arcs = sorted(
+            (i_idx, j_idx)
+            for u, v in service_edges
+            if u != v
+            for i_idx in nodes_by_id.get(u, ())
+            for j_idx in nodes_by_id.get(v, ())
+        )
+        for i_idx, j_idx in arcs:
+            i, j = self.N[i_idx], self.N[j_idx]
+            ij_edge_data = service_edges[i.node_id, j.node_id]
+            self.A[i, j] = ij_edge_data["length"]
+            self.A_PATH[i, j] = ij_edge_data["path"]
 
         self.T_horizon = self._time_horizon()
 
         self.M_TIME = self.T_horizon
         self.M_CAPACITY = self._max_capacity()
         self.M_TYPE = max(SchoolType)
+        self.KAPPA_MAX = max(
+            self.KAPPA[school.type] for school in self.problem_data.schools
+        )
 
     def t_ij(self, i: Place, j: Place) -> float:
         """travel time from node i to node j in minutes"""
 
+        # model builders ask for the same arc once per bus and round, so
+        # only walk the path the first time
+        if (i, j) in self.A_TIME:
+            return self.A_TIME[i, j]
+
         nodes = self.A_PATH[i, j]
         paths = get_paths_between_nodes(nodes, self.problem_data.service_graph)
 
@@ -288,6 +310,7 @@ class Formulation3:
                 meters=(isinstance(self.problem_data, ProblemDataReal)),
             )
 
+        self.A_TIME[i, j] = travel_time
         return travel_time
 
     def d_ij(self, i: Place, j: Place) -> float:
@@ -295,6 +318,16 @@ class Formulation3:
 
         return self.A[i, j]
 
+    def arc_costs(self) -> tuple[list[float], list[float]]:
+        """
+        distances (km) and travel times (minutes) of every arc, in the order of A,
+        prefer this over d_ij / t_ij when a builder needs all arcs
+        """
+
+        distances = [self.d_ij(i, j) for i, j in self.A]
+        travel_times = [self.t_ij(i, j) for i, j in self.A]
+        return distances, travel_times
+
     def _max_capacity(self):
         return max(C_b(bus) for bus in self.problem_data.buses)
 
@@ -305,9 +338,7 @@ class Formulation3:
 
     def C_CAP_B(self, b: Bus):
         """capacity upper bound for bus b, used in big-M constraints"""
-        return C_b(b) * max(
-            self.KAPPA[school.type] for school in self.problem_data.schools
-        )
+        return C_b(b) * self.KAPPA_MAX
 
 
 @cache
@@ -315,17 +346,47 @@ def get_paths_between_nodes(
     nodes: tuple[NodeId, ...], service_graph: "nx.MultiDiGraph[NodeId]"
 ) -> list[tuple[NodeId, ...]]:
     """utility function to get paths between consecutive nodes in a list"""
+    service_edges = get_edge_index(service_graph)
+
     paths = []
-    for k in range(len(nodes) - 1):
-        edge_data = service_graph.get_edge_data(
-            nodes[k], nodes[k + 1], key=0, default=None
-        )
+    for u, v in zip(nodes[:-1], nodes[1:]):
+        edge_data = service_edges.get((u, v))
         if edge_data is not None:
             paths.append(edge_data["path"])
 
     return paths
 
 
+@cache
+def get_edge_travel_time(
+    u: NodeId,
+    v: NodeId,
+    base_graph: "nx.MultiDiGraph[NodeId]",
+    meters: bool = False,
+) -> float:
+    """utility function to get travel time along a single edge, shared by every path using it"""
+
+    edge_data = base_graph.get_edge_data(u, v, key=0)
+    speed = BUS_SPEED_NOT_HIGHWAY  # default speed if no edge data
+    if edge_data is not None:
+        is_school_zone: bool = edge_data.get("hazard", "") == "school_zone"
+        is_highway: bool = edge_data.get("highway", "") == "motorway"
+        speed_limit_mph: str = float(
+            edge_data.get("maxspeed", "40 mph").split()[0]
+        )  # in the format '30 mph'
+        speed_limit = speed_limit_mph / MPH_TO_KM_PER_MIN
+
+        if is_school_zone:
+            speed = min(BUS_SPEED_SCHOOL_ZONE, speed_limit)
+        elif is_highway:
+            speed = speed_limit
+        else:
+            speed = min(BUS_SPEED_NOT_HIGHWAY, speed_limit)
+
+    length_km = (edge_data["length"] / 1000.0) if meters else edge_data["length"]
+    return length_km / speed
+
+
 @cache
 def get_travel_time(
     path: tuple[NodeId, ...],
@@ -335,26 +396,8 @@ def get_travel_time(
     """utility function to get travel time along a path, used for caching travel times"""
 
     travel_time = 0.0
-    for k in range(len(path) - 1):
-        edge_data = base_graph.get_edge_data(path[k], path[k + 1], key=0)
-        speed = BUS_SPEED_NOT_HIGHWAY  # default speed if no edge data
-        if edge_data is not None:
-            is_school_zone: bool = edge_data.get("hazard", "") == "school_zone"
-            is_highway: bool = edge_data.get("highway", "") == "motorway"
-            speed_limit_mph: str = float(
-                edge_data.get("maxspeed", "40 mph").split()[0]
-            )  # in the format '30 mph'
-            speed_limit = speed_limit_mph / MPH_TO_KM_PER_MIN
-
-            if is_school_zone:
-                speed = min(BUS_SPEED_SCHOOL_ZONE, speed_limit)
-            elif is_highway:
-                speed = speed_limit
-            else:
-                speed = min(BUS_SPEED_NOT_HIGHWAY, speed_limit)
-
-        length_km = (edge_data["length"] / 1000.0) if meters else edge_data["length"]
-        travel_time += length_km / speed
+    for u, v in zip(path[:-1], path[1:]):
+        travel_time += get_edge_travel_time(u, v, base_graph, meters)
 
     return travel_time
 
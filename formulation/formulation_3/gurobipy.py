@@ -46,8 +46,6 @@ def build_model_from_definition(
     M_TIME = problem.M_TIME
     M_CAPACITY = problem.M_CAPACITY
     ALPHA = problem.ALPHA
-    t_ij = problem.t_ij
-    d_ij = problem.d_ij
     T_horizon = problem.T_horizon
     EPSILON = problem.EPSILON
     H_RIDE = problem.H_RIDE
@@ -107,37 +105,29 @@ def build_model_from_definition(
         if student.demographics.wheelchair_user:
             wheelchair_student_indices.append(m)
 
-    depot_start_arcs_by_bus = {
-        b: arcs_from_node[node_to_idx[make_depot_start_copy(depot_b(bus))]]
-        for b, bus in enumerate(B)
-    }
-    depot_start_in_arcs_by_bus = {
-        b: arcs_to_node[node_to_idx[make_depot_start_copy(depot_b(bus))]]
-        for b, bus in enumerate(B)
-    }
-    depot_end_arcs_by_bus = {
-        b: arcs_to_node[node_to_idx[make_depot_end_copy(depot_b(bus))]]
-        for b, bus in enumerate(B)
-    }
-    depot_end_out_arcs_by_bus = {
-        b: arcs_from_node[node_to_idx[make_depot_end_copy(depot_b(bus))]]
-        for b, bus in enumerate(B)
-    }
-    school_copy_out_arcs = {
-        s: arcs_from_node[school_copy_node_indices[s]] for s in S_idx
-    }
-    school_copy_in_arcs = {s: arcs_to_node[school_copy_node_indices[s]] for s in S_idx}
-
-    distance_by_arc = {arc_idx: d_ij(*path) for arc_idx, path in enumerate(A_list)}
-    travel_time_by_arc = {arc_idx: t_ij(*path) for arc_idx, path in enumerate(A_list)}
-    arc_start_idx = {
-        arc_idx: node_to_idx[path[0]] for arc_idx, path in enumerate(A_list)
-    }
-    arc_end_idx = {arc_idx: node_to_idx[path[1]] for arc_idx, path in enumerate(A_list)}
+    # per-bus and per-arc data as lists indexed by position in B and A_list
+    depot_start_by_bus = [make_depot_start_copy(depot_b(bus)) for bus in B]
+    depot_end_by_bus = [make_depot_end_copy(depot_b(bus)) for bus in B]
+    depot_start_arcs_by_bus = [
+        arcs_from_node[node_to_idx[d]] for d in depot_start_by_bus
+    ]
+    depot_start_in_arcs_by_bus = [
+        arcs_to_node[node_to_idx[d]] for d in depot_start_by_bus
+    ]
+    depot_end_arcs_by_bus = [arcs_to_node[node_to_idx[d]] for d in depot_end_by_bus]
+    depot_end_out_arcs_by_bus = [
+        arcs_from_node[node_to_idx[d]] for d in depot_end_by_bus
+    ]
+    school_copy_out_arcs = [arcs_from_node[i] for i in school_copy_node_indices]
+    school_copy_in_arcs = [arcs_to_node[i] for i in school_copy_node_indices]
+
+    distance_by_arc, travel_time_by_arc = problem.arc_costs()
+    arc_start_idx = [node_to_idx[path[0]] for path in A_list]
+    arc_end_idx = [node_to_idx[path[1]] for path in A_list]
     service_node_indices = pickup_node_indices + school_node_indices
-    range_limit_by_bus = {b: R_b(bus) * METERS_PER_MILE for b, bus in enumerate(B)}
-    capacity_by_bus = {b: C_b(bus) for b, bus in enumerate(B)}
-    cap_upper_by_bus = {b: C_CAP_B(bus) for b, bus in enumerate(B)}
+    range_limit_by_bus = [R_b(bus) * METERS_PER_MILE for bus in B]
+    capacity_by_bus = [C_b(bus) for bus in B]
+    cap_upper_by_bus = [C_CAP_B(bus) for bus in B]
 
     model = gp.Model("formulation3_gurobi")
     model.Params.OutputFlag = 1
@@ -604,7 +594,6 @@ def make_report(prob: gp.Model, formulation: Formulation3, model_vars: dict[str,
 
     B = formulation.B
     M = formulation.M
-    S = formulation.S
     A = formulation.A
     Q = formulation.Q
 
@@ -619,33 +608,40 @@ def make_report(prob: gp.Model, formulation: Formulation3, model_vars: dict[str,
     # e_bqs = model_vars["e_bqs"]
     r_bmon: tupledict[tuple[Any, ...], Var] = model_vars["r_bmon"]
 
-    result_string = ""
+    result_lines: list[str] = []
 
     if prob.status not in [GRB.OPTIMAL]:
-        result_string += (
+        result_lines.append(
             f"⚠️ Solver did not find a feasible solution (status={prob.status}).\n"
         )
     else:
+        # read every solution value up front
+        z_bq_x = prob.getAttr("X", z_bq)
+        y_bqtau_x = prob.getAttr("X", y_bqtau)
+        x_bqij_x = prob.getAttr("X", x_bqij)
+        a_mbq_x = prob.getAttr("X", a_mbq)
+        r_bmon_x = prob.getAttr("X", r_bmon)
+
         for b, bus in enumerate(B):
-            result_string += f"{bus} (capacity {C_b(bus)}, range {R_b(bus)}, wheelchair access {Wh_b(bus) == 1}, monitor needed: {r_bmon[b].X > 0.5})\n"
+            result_lines.append(
+                f"{bus} (capacity {C_b(bus)}, range {R_b(bus)}, wheelchair access {Wh_b(bus) == 1}, monitor needed: {r_bmon_x[b] > 0.5})\n"
+            )
             for q in range(len(Q)):
-                assert z_bq[b, q].X is not None
-                if z_bq[b, q].X > 0.5:
-                    result_string += f"  Round {q}:\n"
+                if z_bq_x[b, q] > 0.5:
+                    result_lines.append(f"  Round {q}:\n")
                     route = []
-                    students_on_bus = []
+                    students_on_bus = [
+                        student for m, student in enumerate(M) if a_mbq_x[m, b, q] > 0.5
+                    ]
+                    schools_of_students = {s_m(student) for student in students_on_bus}
                     schools_served = []
                     for ij, path in enumerate(A.keys()):
-                        if x_bqij[b, q, ij].X > 0.5:
+                        if x_bqij_x[b, q, ij] > 0.5:
                             route.append(path)
                             for node in path:
                                 if (
-                                    node in S
+                                    node in schools_of_students
                                     and node not in schools_served
-                                    and any(
-                                        a_mbq[m, b, q].X > 0.5 and s_m(M[m]) == node
-                                        for m in range(len(M))
-                                    )
                                 ):
                                     schools_served.append(node)
                     route_by_start = {path[0]: path for path in route}
@@ -665,23 +661,22 @@ def make_report(prob: gp.Model, formulation: Formulation3, model_vars: dict[str,
                         ordered_route.append(next_path)
                         current_node = next_path[1]
 
-                    for m, student in enumerate(M):
-                        if a_mbq[m, b, q].X > 0.5:
-                            students_on_bus.append(student)
-                    result_string += f"    Total travel distance: {sum(formulation.d_ij(*path) for path in ordered_route):.2f} meters\n"
+                    result_lines.append(
+                        f"    Total travel distance: {sum(formulation.d_ij(*path) for path in ordered_route):.2f} meters\n"
+                    )
                     school_type = TAU[
                         max(
                             (tau for tau in range(len(TAU))),
-                            key=lambda tau: (
-                                y_bqtau[b, q, tau].X
-                                if y_bqtau[b, q, tau].X is not None
-                                else 0
-                            ),
+                            key=lambda tau: y_bqtau_x[b, q, tau],
                         )
                     ]
-                    result_string += f"    Bus type: {school_type.name}\n"
-                    result_string += f"    Students on bus this round:\n      {'\n      '.join(str(student) for student in students_on_bus)}\n"
-                    result_string += f"    Schools served:\n      {'\n      '.join(str(school) for school in schools_served)}\n"
+                    result_lines.append(f"    Bus type: {school_type.name}\n")
+                    result_lines.append(
+                        f"    Students on bus this round:\n      {'\n      '.join(str(student) for student in students_on_bus)}\n"
+                    )
+                    result_lines.append(
+                        f"    Schools served:\n      {'\n      '.join(str(school) for school in schools_served)}\n"
+                    )
 
                     # Sort route by travel time from depot start
                     # depot_start = make_depot_start_copy(depot_b(bus))
@@ -696,11 +691,11 @@ def make_report(prob: gp.Model, formulation: Formulation3, model_vars: dict[str,
                     #             current_node = path[1]
                     #             break
 
-                    result_string += "    Route:\n"
+                    result_lines.append("    Route:\n")
                     for path in ordered_route:
-                        result_string += f"      {path[0]} -> {path[1]}\n"
+                        result_lines.append(f"      {path[0]} -> {path[1]}\n")
 
-    return result_string
+    return "".join(result_lines)
 
 
 def plot_bus_routes(
@@ -744,6 +739,9 @@ def plot_bus_routes(
     if prob.status not in [GRB.OPTIMAL]:
         print("No feasible solution to visualize.")
     else:
+        z_bq_x = prob.getAttr("X", z_bq)
+        x_bqij_x = prob.getAttr("X", x_bqij)
+
         # Visualize the routes on the graph
         if per_round:
             fig, axes = plt.subplots(
@@ -770,9 +768,9 @@ def plot_bus_routes(
             _, ax = ox.plot_graph(graph, ax=ax, node_size=8, show=False)
             for b, _ in enumerate(B):
                 for q in qs:
-                    if z_bq[b, q].X > 0.5:
+                    if z_bq_x[b, q] > 0.5:
                         for ij, path in enumerate(A.keys()):
-                            if x_bqij[b, q, ij].X > 0.5:
+                            if x_bqij_x[b, q, ij] > 0.5:
                                 path_edges = A_PATH[path]
                                 if path_edges:
                                     ox.plot_graph_route(